@@ -1,19 +1,32 @@
-import requests
+import html
+import httpx
+import orjson
+import atexit
 import logging
+import queue
 import os
+import sys
 import time
-from datetime import datetime, timedelta, timezone
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from hashlib import blake2b
 from dotenv import load_dotenv
-import telegram
-from telegram.error import TelegramError
+from rbloom import Bloom
 import asyncio
 
-# Configure logging
+# Configure logging (records are queued and written to the file on a background
+# thread, so logging never blocks the event loop on disk I/O)
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(log_queue, logging.FileHandler('twitter_telegram_monitor.log'))
+log_listener.start()
+atexit.register(log_listener.stop)
 logging.basicConfig(
-    filename='twitter_telegram_monitor.log',
+    handlers=[QueueHandler(log_queue)],
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
+# httpx logs every request URL at INFO, and Telegram's URL contains the bot token
+logging.getLogger('httpx').setLevel(logging.WARNING)
 
 # Load environment variables
 load_dotenv()
@@ -21,10 +34,21 @@ BEARER_TOKEN = os.getenv('TWITTER_BEARER_TOKEN')
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 TELEGRAM_CHANNEL_ID = os.getenv('TELEGRAM_CHANNEL_ID')
 
-# Initialize Telegram bot
-bot = telegram.Bot(token=TELEGRAM_BOT_TOKEN)
+TELEGRAM_SEND_URL = f'https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage'
+
+def twitter_auth(request):
+    """Attach the bearer token to Twitter API requests only"""
+    if request.url.host == 'api.twitter.com':
+        request.headers['Authorization'] = f'Bearer {BEARER_TOKEN}'
+    return request
+
+# Shared HTTP/2 client so every Twitter and Telegram call reuses pooled connections
+CLIENT = httpx.AsyncClient(http2=True, timeout=10.0, auth=twitter_auth)
 
 # ====== CONFIGURATION ======
+# Delivery mode
+USE_FILTERED_STREAM = True  # Receive tweets over the filtered stream (False polls recent search instead)
+
 # Time windows (all in minutes)
 CHECK_INTERVAL_MINS = 1  # How often to check for new tweets
 LOOKBACK_MINS = 1    # How far back to look for tweets
@@ -51,117 +75,372 @@ HANDLES = [
     'JakeGagain'
 ]
 
-# Rate limiting configuration
+# Rate limiting configuration (Twitter's x-rate-limit-* headers take precedence)
 RATE_LIMIT_REQUESTS = 15  # Twitter's limit
 RATE_LIMIT_WINDOW = 15 * 60  # 15 minutes in seconds
 
+# Recent search configuration (static params are built once, not per poll)
+SEARCH_URL = 'https://api.twitter.com/2/tweets/search/recent'
+TWEET_FIELDS = 'created_at,author_id'
+SEARCH_PARAMS = {'max_results': MAX_TWEETS_PER_CHECK, 'tweet.fields': TWEET_FIELDS}
+AUTHORS_PER_QUERY = 15  # ~28 chars per author keeps each query under the 512-char limit
+
+# Filtered stream configuration
+STREAM_URL = 'https://api.twitter.com/2/tweets/search/stream'
+STREAM_RULES_URL = f'{STREAM_URL}/rules'
+STREAM_PARAMS = {'tweet.fields': TWEET_FIELDS}
+STREAM_RULE_TAG = 'kol-alerts'  # Only rules with this tag are replaced at startup
+AUTHORS_PER_RULE = 5  # Keeps each rule value well under the 512-char limit
+STREAM_BACKOFF_MIN = 5  # Seconds before the first reconnect attempt
+STREAM_BACKOFF_MAX = 320  # Cap for the exponential reconnect backoff
+STREAM_RATE_LIMIT_BACKOFF = 60  # Minimum wait after a 429 on connect
+STREAM_STALL_TIMEOUT = 90  # Reconnect if nothing (not even a keep-alive) arrives for this long
+
+# Telegram configuration
+TELEGRAM_MAX_MESSAGE_LEN = 4096  # Telegram rejects longer messages
+TELEGRAM_QUEUE_SIZE = 1000  # Pending messages kept before the oldest are dropped
+TELEGRAM_SEND_RATE = 1.0  # Sustained messages per second (Telegram allows ~1 msg/s per chat)
+TELEGRAM_SEND_BURST = 3  # Messages that may go out back-to-back after a quiet spell
+
+# Seen-tweets Bloom filter (persisted so restarts don't re-alert)
+SEEN_TWEETS_FILE = 'seen_tweets.bloom'
+SEEN_TWEETS_CAPACITY = 1_000_000  # Tweet IDs the filter is sized for (~3.6 MB)
+SEEN_TWEETS_FP_RATE = 1e-6  # Chance a new tweet is mistaken for a seen one
+
 # Convert minutes to seconds for internal use
 CHECK_INTERVAL = CHECK_INTERVAL_MINS * 60
+STATUS_REFRESH_SECS = 5  # How often the terminal countdown is redrawn
+
+# Messages wait here for telegram_worker, so monitoring never blocks on a send
+TG_QUEUE = asyncio.Queue(maxsize=TELEGRAM_QUEUE_SIZE)
+
+class TokenBucket:
+    """Token bucket rate limiter holding at most `capacity` tokens, refilled at `rate` per second"""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'last')
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+
+    def try_acquire(self, now):
+        """Take a token if one is available at monotonic time `now`"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self):
+        """Seconds until the next token becomes available"""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+class TelegramError(Exception):
+    """Raised when the Telegram Bot API rejects a request"""
+
+class RateLimitExceeded(Exception):
+    """Raised on a 429 from Twitter, carrying when the quota resets"""
+
+    def __init__(self, reset):
+        super().__init__("Rate limit exceeded")
+        self.reset = reset
+
+class InvalidTokenError(Exception):
+    """Raised when Twitter rejects the bearer token, which retrying can't fix"""
 
 async def send_telegram_message(message):
-    """Send message to Telegram channel"""
+    """Send message to Telegram channel, returning whether it was delivered"""
+    payload = {
+        'chat_id': TELEGRAM_CHANNEL_ID,
+        'text': message,
+        'parse_mode': 'HTML',
+        'disable_web_page_preview': True
+    }
     try:
-        await bot.send_message(
-            chat_id=TELEGRAM_CHANNEL_ID,
-            text=message,
-            parse_mode='HTML',
-            disable_web_page_preview=True
-        )
-    except TelegramError as e:
+        response = await CLIENT.post(TELEGRAM_SEND_URL, json=payload)
+        result = orjson.loads(response.content)
+        if response.status_code == 429:
+            # Flood control: wait as long as Telegram asks, then retry once
+            await asyncio.sleep(result.get('parameters', {}).get('retry_after', 1))
+            response = await CLIENT.post(TELEGRAM_SEND_URL, json=payload)
+            result = orjson.loads(response.content)
+        if not result.get('ok'):
+            raise TelegramError(result.get('description', response.text))
+        return True
+    except (httpx.HTTPError, orjson.JSONDecodeError, TelegramError) as e:
         logging.error(f"Telegram error: {e}")
         print(f"❌ Telegram error: {e}")
+        return False
+
+def enqueue_telegram_message(message):
+    """Queue a message for the Telegram worker, dropping the oldest if the queue is full"""
+    if TG_QUEUE.full():
+        TG_QUEUE.get_nowait()
+        TG_QUEUE.task_done()
+        logging.warning("Telegram queue full, dropped oldest message")
+    TG_QUEUE.put_nowait(message)
+
+async def telegram_worker():
+    """Send queued messages to Telegram, paced to stay under its rate limits"""
+    bucket = TokenBucket(TELEGRAM_SEND_RATE, TELEGRAM_SEND_BURST)
+    while True:
+        message = await TG_QUEUE.get()
+        while not bucket.try_acquire(time.monotonic()):
+            await asyncio.sleep(bucket.wait_time())
+        await send_telegram_message(message)
+        TG_QUEUE.task_done()
+
+def tweet_id_hash(tweet_id):
+    """Stable 128-bit hash, so the seen-tweets filter can be saved and reloaded"""
+    return int.from_bytes(blake2b(tweet_id.encode(), digest_size=16).digest(), 'big', signed=True)
+
+def load_seen_tweets():
+    """Load the seen-tweets filter from the last run, or start an empty one"""
+    if os.path.exists(SEEN_TWEETS_FILE):
+        try:
+            return Bloom.load(SEEN_TWEETS_FILE, tweet_id_hash)
+        except Exception as e:
+            logging.error(f"Failed to load {SEEN_TWEETS_FILE}, starting fresh: {e}")
+    return Bloom(SEEN_TWEETS_CAPACITY, SEEN_TWEETS_FP_RATE, tweet_id_hash)
 
-def get_user_ids(usernames):
+async def get_user_ids(usernames):
     """Get Twitter user IDs from usernames in a single batch request"""
-    headers = {'Authorization': f'Bearer {BEARER_TOKEN}'}
     usernames_str = ','.join(usernames)
 
-    response = requests.get(
-        f'https://api.twitter.com/2/users/by?usernames={usernames_str}',
-        headers=headers
+    response = await CLIENT.get(
+        f'https://api.twitter.com/2/users/by?usernames={usernames_str}'
     )
     if response.status_code != 200:
         raise Exception(f"Failed to get user IDs: {response.text}")
 
     return {user['username'].lower(): user['id']
-            for user in response.json()['data']}
+            for user in orjson.loads(response.content)['data']}
 
-def get_latest_tweets_batch(user_ids, debug=False):
-    """Get latest tweet from each user in a single request"""
+def build_author_queries(user_ids, authors_per_query):
+    """Build one query per chunk of user IDs, matching tweets from any of them"""
+    return [f"({' OR '.join(f'from:{uid}' for uid in user_ids[i:i + authors_per_query])})"
+            for i in range(0, len(user_ids), authors_per_query)]
+
+async def get_latest_tweets_batch(query, debug=False):
+    """Get latest tweets for a prebuilt author query, with the quota left and its reset time"""
     if debug:
         print("\n🔍 Debug Information:")
-    headers = {'Authorization': f'Bearer {BEARER_TOKEN}'}
-    url = 'https://api.twitter.com/2/tweets/search/recent'
-
-    # Format time for lookback window
-    lookback_time = datetime.now(timezone.utc) - timedelta(minutes=LOOKBACK_MINS)
-    formatted_time = lookback_time.strftime('%Y-%m-%dT%H:%M:%SZ')
 
-    # Build query for all users
-    user_queries = ' OR '.join(f'from:{uid}' for uid in user_ids)
+    # Format time for lookback window (plain gmtime fields, no datetime/strftime per poll)
+    tm = time.gmtime(time.time() - LOOKBACK_MINS * 60)
+    formatted_time = (f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+                      f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}Z")
 
-    params = {
-        'query': f'({user_queries})',
-        'max_results': MAX_TWEETS_PER_CHECK,
-        'tweet.fields': 'created_at,author_id',
-        'start_time': formatted_time
-    }
+    params = {**SEARCH_PARAMS, 'query': query, 'start_time': formatted_time}
 
     if debug:
         print(f"🔍 API Query: {params['query']}")
         print(f"🔍 Start Time: {formatted_time}")
 
-    response = requests.get(url, headers=headers, params=params)
+    response = await CLIENT.get(SEARCH_URL, params=params)
 
     if debug:
         print(f"🔍 Response Status: {response.status_code}")
         print(f"🔍 Response Headers: {dict(response.headers)}")
         print(f"🔍 Full Response: {response.text}\n")
 
+    # Fall back to a full window if Twitter ever omits the headers
+    remaining = int(response.headers.get('x-rate-limit-remaining', RATE_LIMIT_REQUESTS))
+    reset = int(response.headers.get('x-rate-limit-reset', time.time() + RATE_LIMIT_WINDOW))
+
     if response.status_code == 429:
-        raise Exception("Rate limit exceeded")
+        raise RateLimitExceeded(reset)
+    elif response.status_code == 401:
+        raise InvalidTokenError(f"Invalid Twitter bearer token: {response.text}")
     elif response.status_code != 200:
         raise Exception(f"Failed to get tweets: {response.text}")
 
-    data = response.json()
+    data = orjson.loads(response.content)
     if debug and 'meta' in data:
         print(f"🔍 Result Count: {data['meta'].get('result_count', 0)}")
 
-    return data.get('data', [])
+    return data.get('data', []), remaining, reset
+
+async def sync_stream_rules(user_ids, debug=False):
+    """Replace our filtered-stream rules with one rule per chunk of authors"""
+    response = await CLIENT.get(STREAM_RULES_URL)
+    if response.status_code != 200:
+        raise Exception(f"Failed to get stream rules: {response.text}")
+
+    stale_ids = [rule['id'] for rule in orjson.loads(response.content).get('data', [])
+                 if rule.get('tag') == STREAM_RULE_TAG]
+    if stale_ids:
+        response = await CLIENT.post(STREAM_RULES_URL, json={'delete': {'ids': stale_ids}})
+        if response.status_code != 200:
+            raise Exception(f"Failed to delete stream rules: {response.text}")
 
-async def monitor_tweets(debug_first_check=False):
+    rules = [{'value': query, 'tag': STREAM_RULE_TAG}
+             for query in build_author_queries(user_ids, AUTHORS_PER_RULE)]
+    if debug:
+        print("\n🔍 Debug Information:")
+        for rule in rules:
+            print(f"🔍 Stream Rule: {rule['value']}")
+
+    response = await CLIENT.post(STREAM_RULES_URL, json={'add': rules})
+    if response.status_code not in (200, 201):
+        raise Exception(f"Failed to add stream rules: {response.text}")
+
+    if debug:
+        print(f"🔍 Rules Response: {response.text}\n")
+
+async def stream_tweets(user_ids, debug=False):
+    """Yield tweets from the filtered stream as soon as Twitter delivers them"""
+    timeout = httpx.Timeout(10.0, read=STREAM_STALL_TIMEOUT)
+
+    # Rules persist server-side, so they only need pushing once per run
+    await sync_stream_rules(user_ids, debug=debug)
+
+    backoff = STREAM_BACKOFF_MIN
+    while True:
+        try:
+            async with CLIENT.stream('GET', STREAM_URL, params=STREAM_PARAMS,
+                                     timeout=timeout) as response:
+                if response.status_code == 200:
+                    backoff = STREAM_BACKOFF_MIN
+                    logging.info("Connected to filtered stream")
+                    print("\n📡 Connected to filtered stream")
+
+                    async for line in response.aiter_lines():
+                        # Blank lines are keep-alive heartbeats
+                        if not line.strip():
+                            continue
+                        payload = orjson.loads(line)
+                        if 'data' in payload:
+                            yield payload['data']
+                        elif 'errors' in payload:
+                            logging.error(f"Stream error: {payload['errors']}")
+                    reason = "Stream closed by Twitter"
+                else:
+                    await response.aread()
+                    # Only rate limits and server errors are worth retrying
+                    if response.status_code != 429 and response.status_code < 500:
+                        raise Exception(f"Failed to connect to stream: {response.text}")
+                    if response.status_code == 429:
+                        backoff = max(backoff, STREAM_RATE_LIMIT_BACKOFF)
+                    reason = f"Stream connection refused ({response.status_code})"
+        except httpx.TransportError as e:
+            reason = f"Stream connection lost: {str(e) or type(e).__name__}"
+
+        # Back off exponentially so reconnect storms don't get the IP banned
+        logging.warning(f"{reason}. Reconnecting in {backoff}s")
+        print(f"\n⚠️ {reason}. Reconnecting in {backoff}s...")
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, STREAM_BACKOFF_MAX)
+
+def format_alert(tweet, id_to_username, seen_tweets):
+    """Format the alert for a tweet we haven't alerted on yet, else return None"""
+    if tweet['id'] in seen_tweets:
+        return None
+
+    # Ignore authors we don't track (e.g. rules owned by another app)
+    username = id_to_username.get(tweet['author_id'])
+    if username is None:
+        return None
+
+    seen_tweets.add(tweet['id'])
+
+    # Format message for Telegram in one f-string, so it's built in a single pass
+    # (tweet text is escaped for HTML parse mode)
+    return (f"🔔 New Tweet from @{username}!\n\n"
+            f"📝 {html.escape(tweet['text'], quote=False)}\n\n"
+            f"🔗 https://twitter.com/i/web/status/{tweet['id']}")
+
+def batch_messages(messages, limit=TELEGRAM_MAX_MESSAGE_LEN):
+    """Join messages into as few Telegram messages as fit under the length limit"""
+    batches = []
+    current = ''
+    for message in messages:
+        if current and len(current) + 2 + len(message) > limit:
+            batches.append(current)
+            current = message
+        else:
+            current = f"{current}\n\n{message}" if current else message
+    if current:
+        batches.append(current)
+    return batches
+
+def dispatch_tweet(tweet, id_to_username, seen_tweets):
+    """Queue a Telegram alert for a tweet we haven't alerted on yet"""
+    message = format_alert(tweet, id_to_username, seen_tweets)
+    if message is None:
+        return
+
+    enqueue_telegram_message(message)
+    logging.info(f"Queued alert for tweet {tweet['id']} for Telegram")
+
+async def monitor_tweets(seen_tweets, debug_first_check=False):
     """Monitor tweets and send alerts to Telegram"""
     start_msg = "Twitter Monitor Starting"
     print(f"\n🐦 {start_msg}")
-    await send_telegram_message("🐦 Twitter Monitor Bot Started\n\n" + 
-                              f"Monitoring handles:\n{', '.join(HANDLES)}")
+
+    # Drain alerts to Telegram in the background
+    worker = asyncio.create_task(telegram_worker())
+    enqueue_telegram_message("🐦 Twitter Monitor Bot Started\n\n" +
+                             f"Monitoring handles:\n{', '.join(HANDLES)}")
 
     logging.info(f"{start_msg}. Monitoring handles: {', '.join(HANDLES)}")
 
     # Get user IDs once at startup
-    user_map = get_user_ids(HANDLES)
+    user_map = await get_user_ids(HANDLES)
     user_ids = list(user_map.values())
-    id_to_username = {v: k for k, v in user_map.items()}
+    # Intern the IDs once here; per-tweet lookups use the decoded strings as-is
+    id_to_username = {sys.intern(v): k for k, v in user_map.items()}
 
-    seen_tweets = set()
-    requests_made = 0
-    window_start_time = time.time()
+    if USE_FILTERED_STREAM:
+        async for tweet in stream_tweets(user_ids, debug=debug_first_check):
+            logging.info(f"Received tweet {tweet['id']} from stream")
+            dispatch_tweet(tweet, id_to_username, seen_tweets)
+        return
 
-    while True:
-        try:
-            current_time = time.time()
+    # The author list never changes, so build the search queries once
+    queries = build_author_queries(user_ids, AUTHORS_PER_QUERY)
+
+    # Quota as last reported by Twitter's rate limit headers
+    rate_remaining = RATE_LIMIT_REQUESTS
+    rate_reset = 0
+    next_check_time = 0
+    # The first successful check doubles as the search API verification
+    search_verified = False
+
+    async def status_ticker():
+        """Redraw the countdown and rate limit info while waiting for the next check"""
+        while True:
+            now = time.time()
+            wait_time = int(next_check_time - now)
+            if wait_time > 0:
+                remaining_time = int(rate_reset - now)
+                if remaining_time > 0:
+                    print(f"\r⏳ Next check in {wait_time}s | Rate limit: {rate_remaining} requests left (resets in {remaining_time}s)", end='', flush=True)
+                else:
+                    print(f"\r⏳ Next check in {wait_time}s | Rate limit: {rate_remaining} requests left", end='', flush=True)
+            await asyncio.sleep(STATUS_REFRESH_SECS)
 
-            # Reset counter if 15 minutes have passed
-            if current_time - window_start_time >= RATE_LIMIT_WINDOW:
-                requests_made = 0
-                window_start_time = current_time
+    # Only draw the countdown on an interactive terminal
+    ticker = asyncio.create_task(status_ticker()) if sys.stdout.isatty() else None
 
-            # Only proceed if we haven't hit rate limit
-            if requests_made < RATE_LIMIT_REQUESTS:
-                tweets = get_latest_tweets_batch(user_ids, debug=debug_first_check)
+    while True:
+        try:
+            # Only proceed if every query fits in the remaining quota
+            if rate_remaining >= len(queries) or time.time() >= rate_reset:
+                results = await asyncio.gather(*(
+                    get_latest_tweets_batch(query, debug=debug_first_check) for query in queries
+                ))
+                tweets = [tweet for result, _, _ in results for tweet in result]
+                rate_remaining = min(remaining for _, remaining, _ in results)
+                rate_reset = max(reset for _, _, reset in results)
                 if debug_first_check:
                     debug_first_check = False
-                requests_made += 1
+                if not search_verified:
+                    search_verified = True
+                    print(f"✓ Twitter Search API: Working | Rate Limit Remaining: {rate_remaining}")
 
                 # Log the check timestamp
                 check_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -174,46 +453,40 @@ async def monitor_tweets(debug_first_check=False):
                     logging.info(found_msg)
                     print(f"\n📬 {found_msg}")
 
+                # Send every new tweet from this check in as few messages as possible
+                alerts = []
                 for tweet in tweets:
-                    if tweet['id'] not in seen_tweets:
-                        seen_tweets.add(tweet['id'])
-                        tweet_url = f"https://twitter.com/i/web/status/{tweet['id']}"
-                        username = id_to_username[tweet['author_id']]
-                        
-                        # Format message for Telegram
-                        message = (f"🔔 New Tweet from @{username}!\n\n"
-                                 f"📝 {tweet['text']}\n\n"
-                                 f"🔗 {tweet_url}")
-                        
-                        await send_telegram_message(message)
-                        logging.info(f"Sent alert for tweet {tweet['id']} to Telegram")
-
-                # Keep set size manageable
-                if len(seen_tweets) > 1000:
-                    seen_tweets.clear()
-
-            # Print waiting message with rate limit info
-            for i in range(CHECK_INTERVAL, 0, -1):
-                remaining_time = int(window_start_time + RATE_LIMIT_WINDOW - time.time())
-                if remaining_time > 0:
-                    print(f"\r⏳ Next check in {i}s | Rate limit: {requests_made}/{RATE_LIMIT_REQUESTS} requests (resets in {remaining_time}s)", end='', flush=True)
-                else:
-                    print(f"\r⏳ Next check in {i}s | Rate limit: {requests_made}/{RATE_LIMIT_REQUESTS} requests", end='', flush=True)
-                await asyncio.sleep(1)
-            print("\r" + " " * 100 + "\r", end='', flush=True)
+                    message = format_alert(tweet, id_to_username, seen_tweets)
+                    if message is not None:
+                        alerts.append(message)
+                for batch in batch_messages(alerts):
+                    enqueue_telegram_message(batch)
+                if alerts:
+                    logging.info(f"Queued {len(alerts)} alert(s) for Telegram")
+
+                next_check_time = time.time() + CHECK_INTERVAL
+            else:
+                # Quota is used up, so wait for Twitter's reset instead of polling into a 429
+                next_check_time = rate_reset
+
+            # Wait for the next check while the ticker (if any) redraws the countdown
+            await asyncio.sleep(max(0, next_check_time - time.time()))
+            if ticker:
+                print("\r" + " " * 100 + "\r", end='', flush=True)
 
+        except InvalidTokenError:
+            raise
         except Exception as e:
             error_msg = f"Error: {e}"
             logging.error(error_msg)
-            await send_telegram_message(f"❌ {error_msg}")
+            enqueue_telegram_message(f"❌ {error_msg}")
             
-            if "rate limit" in str(e).lower():
-                wait_time = int(window_start_time + RATE_LIMIT_WINDOW - time.time())
+            if isinstance(e, RateLimitExceeded):
+                wait_time = int(e.reset - time.time())
                 if wait_time > 0:
                     print(f"Rate limit hit. Waiting {wait_time} seconds for reset...")
                     await asyncio.sleep(wait_time)
-                requests_made = 0
-                window_start_time = time.time()
+                rate_remaining = RATE_LIMIT_REQUESTS
             else:
                 await asyncio.sleep(CHECK_INTERVAL)
 
@@ -222,30 +495,20 @@ async def verify_setup():
     print("\n🔍 Verifying Setup...")
 
     try:
-        # Test Twitter API
-        headers = {'Authorization': f'Bearer {BEARER_TOKEN}'}
-        test_response = requests.get(
-            'https://api.twitter.com/2/tweets/search/recent?query=from:twitter', 
-            headers=headers
-        )
-        twitter_ok = test_response.status_code == 200
-        print(f"✓ Twitter API: {twitter_ok}")
-        print(f"✓ Rate Limit Remaining: {test_response.headers.get('x-rate-limit-remaining', 'unknown')}")
-
-        # Get and verify user IDs
-        user_map = get_user_ids(HANDLES)
+        # Get and verify user IDs (this also proves the bearer token works;
+        # the first monitor check verifies search without spending extra quota)
+        user_map = await get_user_ids(HANDLES)
+        print("✓ Twitter API: True")
         print("\n✓ Found User IDs:")
         for handle, uid in user_map.items():
             print(f"  - @{handle}: {uid}")
 
         # Test Telegram
-        await bot.send_message(
-            chat_id=TELEGRAM_CHANNEL_ID,
-            text="🔍 Bot setup verification test message"
-        )
+        if not await send_telegram_message("🔍 Bot setup verification test message"):
+            raise Exception("Could not send a Telegram test message")
         print("✓ Telegram Bot: Working")
 
-        return twitter_ok
+        return True
 
     except Exception as e:
         print(f"\n❌ Setup Verification Failed: {e}")
@@ -273,8 +536,10 @@ async def main():
     # Ask if user wants debug mode
     debug_mode = input("\nEnable debug mode for first check? (y/n): ").lower() == 'y'
 
+    seen_tweets = load_seen_tweets()
+
     try:
-        await monitor_tweets(debug_mode)
+        await monitor_tweets(seen_tweets, debug_mode)
     except KeyboardInterrupt:
         await send_telegram_message("👋 Bot shutting down...")
         print("\n\n👋 Shutting down...")
@@ -284,6 +549,9 @@ async def main():
         await send_telegram_message(f"❌ {error_msg}")
         print(f"\n❌ {error_msg}")
         input("Press Enter to exit...")
+    finally:
+        seen_tweets.save(SEEN_TWEETS_FILE)
+        await CLIENT.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file